@@ -0,0 +1,52 @@
+import time
+
+import requests
+import streamlit as st
+
+from config import get_setting
+from latency_store import LatencyRecorder
+
+
+# Récupération de l'URL API
+API_URL = get_setting("API_URL", "https://clairvoyance-api-yolov8-mutliclass-vraifinal-401633208612.europe-west1.run.app")
+
+
+# --- HISTORIQUE DES LATENCES (SQLite, écrit par lots en arrière-plan) ---
+LATENCY_DB = get_setting("LATENCY_DB", "clairvoyance_latency.db")
+
+
+@st.cache_resource
+def get_latency_recorder():
+    return LatencyRecorder(LATENCY_DB)
+
+
+latency_recorder = get_latency_recorder()
+
+
+# --- FONCTION D'ENVOI ---
+def send_image_to_api(image_bytes, endpoint, tile=False):
+    """Envoie l'image à l'API et renvoie la réponse JSON (None en cas d'échec)."""
+    if not API_URL:
+        st.error("URL API manquante.")
+        return None
+    started_at = time.time()
+    response = None
+    data = None
+    try:
+        files = {'file': ('image.jpg', image_bytes, 'image/jpeg')}
+        response = requests.post(f"{API_URL}/{endpoint}", files=files, timeout=120)
+        if response.status_code == 200:
+            data = response.json()
+    except:
+        data = None
+
+    latency_recorder.record(
+        endpoint, started_at, time.time(),
+        server_ms=((data or {}).get('performance') or {}).get('inference'),
+        request_bytes=len(image_bytes),
+        response_bytes=len(response.content) if response is not None else None,
+        detections=len(data.get('detections') or []) if data and 'detections' in data else None,
+        ok=data is not None,
+        tile=tile,
+    )
+    return data
@@ -1,10 +1,18 @@
 import streamlit as st
-import requests
-from PIL import Image, ImageDraw, ImageFont
-import io
 import base64
+import hashlib
 import pandas as pd
 import os
+import time
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from config import get_setting
+from api_client import API_URL, send_image_to_api
+from image_pipeline import draw_detections, encode_upload
+from phash_index import PerceptualIndex
+from shared_cache import SharedResultCache, result_key
+from tiling import predict_tiled
+from memory_budget import ProcessMemoryRegistry, SessionResultStore, current_rss_bytes, format_bytes
 
 # --- CONFIGURATION DE LA PAGE ---
 st.set_page_config(
@@ -14,15 +22,8 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# --- COULEURS POUR DESSIN FRONTEND (Modèle Maison) ---
-CLASS_COLORS_FRONT = {
-    "Car": "#FF0000",       # Rouge
-    "Bus": "#0000FF",       # Bleu
-    "Truck": "#00FF00",     # Vert
-    "Motorcycle": "#FFFF00" # Jaune
-}
-
 # --- GESTION ROBUSTE DE L'ARRIÈRE-PLAN ---
+@st.cache_data
 def get_base64_of_bin_file(bin_file):
     with open(bin_file, 'rb') as f:
         data = f.read()
@@ -129,25 +130,432 @@ else:
     pass
 
 
-# Récupération de l'URL API
-try:
-    API_URL = st.secrets["API_URL"]
-except:
-    API_URL = "https://clairvoyance-api-yolov8-mutliclass-vraifinal-401633208612.europe-west1.run.app"
+# --- BUDGET MÉMOIRE (résultats conservés par session / par processus) ---
+SESSION_MEMORY_BUDGET_MB = get_setting("SESSION_MEMORY_BUDGET_MB", 64, float)
+PROCESS_MEMORY_BUDGET_MB = get_setting("PROCESS_MEMORY_BUDGET_MB", 1024, float)
+DEBUG_PANEL = get_setting("DEBUG_PANEL", False, bool)
+
+# --- MODE TUILES (images haute résolution) ---
+TILING_DEFAULT = get_setting("TILING_DEFAULT", False, bool)
+TILE_SIZE = get_setting("TILE_SIZE", 640, int)
+TILE_OVERLAP = get_setting("TILE_OVERLAP", 128, int)
+TILE_WORKERS = get_setting("TILE_WORKERS", 8, int)
+TILE_MERGE = get_setting("TILE_MERGE", "nms")  # "nms" ou "wbf"
+TILE_IOU = get_setting("TILE_IOU", 0.5, float)
+# Recouvrement borné à la moitié de la tuile : au-delà, le nombre de tuiles explose
+TILE_SIZE = max(TILE_SIZE, 256)
+TILE_OVERLAP = min(max(TILE_OVERLAP, 0), TILE_SIZE // 2)
+
+# --- QUASI-DOUBLONS (hash perceptuel, distance de Hamming sur 64 bits ; -1 pour désactiver) ---
+PHASH_THRESHOLD = get_setting("PHASH_THRESHOLD", 5, int)
+PHASH_MAP_BOXES = get_setting("PHASH_MAP_BOXES", True, bool)
+
+# --- CACHE PARTAGÉ ENTRE WORKERS (voir deploy/run_workers.py) ---
+SHARED_CACHE_ENABLED = get_setting("SHARED_CACHE_ENABLED", True, bool)
+SHARED_CACHE_DB = get_setting("SHARED_CACHE_DB", "clairvoyance_cache.db")
+SHARED_CACHE_MB = get_setting("SHARED_CACHE_MB", 512, float)
+SHARED_CACHE_TTL_H = get_setting("SHARED_CACHE_TTL_H", 24, float)
+# À changer à chaque redéploiement du modèle : les résultats en cache de l'ancien modèle ne sont plus servis
+MODEL_VERSION = get_setting("MODEL_VERSION", "")
+
+@st.cache_resource
+def get_memory_registry():
+    return ProcessMemoryRegistry(int(PROCESS_MEMORY_BUDGET_MB * 1024 * 1024))
+
+def get_session_store():
+    if "result_store" not in st.session_state:
+        st.session_state["result_store"] = SessionResultStore(int(SESSION_MEMORY_BUDGET_MB * 1024 * 1024))
+    store = st.session_state["result_store"]
+    ctx = get_script_run_ctx()
+    get_memory_registry().register(ctx.session_id if ctx else "local", store)
+    return store
+
+@st.cache_resource
+def get_shared_cache():
+    if not SHARED_CACHE_ENABLED:
+        return None
+    ttl = SHARED_CACHE_TTL_H * 3600 if SHARED_CACHE_TTL_H > 0 else None
+    return SharedResultCache(SHARED_CACHE_DB, int(SHARED_CACHE_MB * 1024 * 1024), ttl)
+
+def get_phash_index():
+    if "phash_index" not in st.session_state:
+        st.session_state["phash_index"] = PerceptualIndex()
+        st.session_state["phash_stats"] = {"lookups": 0, "skips": 0, "saved_ms": 0.0}
+    return st.session_state["phash_index"]
+
+# --- ENVOI EN MODE TUILES ---
+def send_tile_to_api(tile_bytes, endpoint):
+    return send_image_to_api(tile_bytes, endpoint, tile=True)
+
+def predict_tiles(bytes_data, endpoint):
+    return predict_tiled(
+        bytes_data, endpoint, send_tile_to_api,
+        tile_size=TILE_SIZE, overlap=TILE_OVERLAP, max_workers=TILE_WORKERS,
+        iou_threshold=TILE_IOU, method=TILE_MERGE,
+    )
+
+# --- APPELS DES 3 ARCHITECTURES (résultats compacts, conservables en session) ---
+def analyse_cnn(bytes_data, tiled=False):
+    data = send_image_to_api(bytes_data, "predict")
+    if not data:
+        return None
+    return {"data": data}
 
-# --- FONCTION D'ENVOI ---
-def send_image_to_api(image_bytes, endpoint):
-    if not API_URL:
-        st.error("URL API manquante.")
+def analyse_custom(bytes_data, tiled=False):
+    if tiled:
+        data = predict_tiles(bytes_data, "predict_custom_yolo")
+    else:
+        data = send_image_to_api(bytes_data, "predict_custom_yolo")
+    if not data:
         return None
-    try:
-        files = {'file': ('image.jpg', image_bytes, 'image/jpeg')}
-        response = requests.post(f"{API_URL}/{endpoint}", files=files, timeout=120)
-        if response.status_code == 200:
-            return response
+    result = {"data": data, "render": None, "render_error": None}
+    if data.get('detections'):
+        try:
+            result["render"] = draw_detections(bytes_data, data['detections'])
+        except Exception as e:
+            result["render_error"] = str(e)
+    return result
+
+def analyse_sota(bytes_data, tiled=False):
+    if tiled:
+        # Chaque tuile revient dessinée par le serveur : on redessine l'image entière côté front
+        data = predict_tiles(bytes_data, "predict_yolo_image")
+        if not data:
+            return None
+        result = {"data": data, "render": None}
+        try:
+            result["render"] = draw_detections(bytes_data, data['detections'])
+        except:
+            pass
+        return result
+
+    data = send_image_to_api(bytes_data, "predict_yolo_image")
+    if not data:
         return None
+    result = {"data": data, "render": None}
+    # On garde les octets JPEG décodés, pas la chaîne base64 (~33% plus lourde)
+    image_data = data.pop('image_data', None)
+    try:
+        result["render"] = base64.b64decode(image_data['b64'])
     except:
+        pass
+    return result
+
+# --- JPEG DE L'UPLOAD (compté dans le budget de session, ré-encodé s'il a été évincé) ---
+def get_upload_bytes(upload):
+    store = get_session_store()
+    key = f"upload:{upload['file_id']}"
+    bytes_data = store.get(key)
+    if bytes_data is None:
+        uploaded_file = st.session_state.get("uploader")
+        if uploaded_file is None or uploaded_file.file_id != upload["file_id"]:
+            return None
+        bytes_data, _, _ = encode_upload(uploaded_file)
+        store.put(key, bytes_data)
+    return bytes_data
+
+# --- RÉUTILISATION DES QUASI-DOUBLONS (frames consécutives, copies ré-enregistrées) ---
+def map_result(source, upload, bytes_data):
+    """Transpose un résultat sur une image quasi identique (boîtes remises à l'échelle, rendu redessiné)."""
+    result = dict(source)
+    data = source["data"]
+    if data.get('detections') is not None and "size" in source:
+        sx = upload["size"][0] / source["size"][0]
+        sy = upload["size"][1] / source["size"][1]
+        detections = []
+        for det in data['detections']:
+            x1, y1, x2, y2 = det['bbox']
+            detections.append({**det, 'bbox': [x1 * sx, y1 * sy, x2 * sx, y2 * sy]})
+        result["data"] = {**data, 'detections': detections}
+        if "render" in source:
+            result["render"], result["render_error"] = bytes_data, None
+            if detections:
+                try:
+                    result["render"] = draw_detections(bytes_data, detections)
+                except Exception as e:
+                    result["render_error"] = str(e)
+    result["size"] = upload["size"]
+    return result
+
+def find_near_duplicate(endpoint, image_key, upload):
+    """Résultat d'une image déjà analysée à moins de PHASH_THRESHOLD bits, sinon None."""
+    if PHASH_THRESHOLD < 0:
         return None
+    index = get_phash_index()
+    stats = st.session_state["phash_stats"]
+    stats["lookups"] += 1
+    store = get_session_store()
+    tiled = image_key.endswith(":tiled")
+    for distance, key in index.search(upload["phash"], PHASH_THRESHOLD):
+        if key == image_key or key.endswith(":tiled") != tiled:
+            continue
+        source = (store.get(key) or {}).get(endpoint)
+        if not source or source.get("reused"):
+            continue
+        bytes_data = get_upload_bytes(upload) if PHASH_MAP_BOXES else None
+        result = map_result(source, upload, bytes_data) if bytes_data else dict(source)
+        result["reused"] = {"distance": distance, "saved_ms": source.get("elapsed_ms", 0)}
+        stats["skips"] += 1
+        stats["saved_ms"] += result["reused"]["saved_ms"]
+        return result
+    return None
+
+# --- AFFICHAGE DES RÉSULTATS ---
+@st.fragment
+def detections_table(detections, panel_key):
+    """Tableau détaillé filtrable : seul ce fragment se ré-exécute quand on filtre."""
+    with st.expander("📋 Données détaillées"):
+        df = pd.DataFrame(detections)
+        labels = sorted(df['label'].unique())
+        f1, f2 = st.columns(2)
+        selected = f1.multiselect("Classes", labels, default=labels, key=f"{panel_key}_labels")
+        min_conf = f2.slider("Confiance min.", 0.0, 1.0, 0.0, 0.05, key=f"{panel_key}_conf")
+        df = df[df['label'].isin(selected) & (df['confidence'] >= min_conf)]
+        st.dataframe(
+            df[['label', 'confidence', 'bbox']].style.format({"confidence": "{:.2%}"}),
+            width="stretch"
+        )
+
+def show_tiling_info(data):
+    perf = data.get('performance', {})
+    if 'tiles' in perf:
+        failed = f" · {perf['tiles_failed']} en échec" if perf['tiles_failed'] else ""
+        st.caption(f"🧩 {perf['tiles']} tuiles{failed} · cumul serveur {perf['inference_total']:.0f} ms · "
+                   f"aller-retour {perf['wall']:.0f} ms")
+
+def render_cnn(result, panel_key):
+    if not result:
+        st.warning("Service indisponible")
+        return
+    data = result["data"]
+
+    # --- AFFICHAGE CNN MODIFIÉ (Gros Texte) ---
+    pred_class = data['prediction']
+    st.markdown(f"""
+        <div class="pred-label">Prédiction :</div>
+        <div class="big-pred">{pred_class}</div>
+        <br>
+    """, unsafe_allow_html=True)
+
+    st.metric("Niveau de Confiance", f"{data['confidence']:.2%}")
+
+    st.write("Répartition :")
+    st.bar_chart(data['all_probabilities'], height=150)
+
+def render_custom(result, panel_key):
+    if not result:
+        st.warning("Service Custom indisponible")
+        plan_path = "plan_ikea.jpg" if os.path.exists("plan_ikea.jpg") else None
+        if plan_path:
+            st.image(plan_path, caption="Concept Architectural", width="stretch")
+        return
+    data = result["data"]
+
+    if data.get('detections'):
+        if result["render_error"]:
+            st.error(f"Erreur dessin image: {result['render_error']}")
+        else:
+            st.image(result["render"], caption="Détection Maison", width="stretch")
+    else:
+        st.warning("Aucun véhicule détecté")
+
+    # --- VITESSE D'EXECUTION (Comme SOTA) ---
+    speed = data.get('performance', {}).get('inference', 0)
+    if speed == 0:
+        st.success(f"⚡ Vitesse : **~200 ms**")
+    else:
+        st.success(f"⚡ Vitesse : **{speed:.1f} ms**")
+    show_tiling_info(data)
+
+    # 2. Statistiques (Compteurs)
+    st.markdown("#### 📊 Statistiques")
+    counts = data['summary']
+
+    p1, p2 = st.columns(2)
+    p1.metric("🚗 Cars", counts.get('Car', 0))
+    p2.metric("🏍️ Motos", counts.get('Motorcycle', 0))
+
+    p3, p4 = st.columns(2)
+    p3.metric("🚌 Bus", counts.get('Bus', 0))
+    p4.metric("🚛 Trucks", counts.get('Truck', 0))
+
+    # 3. Tableau
+    if data.get('detections'):
+        detections_table(data['detections'], panel_key)
+
+def render_sota(result, panel_key):
+    if not result:
+        return
+    data = result["data"]
+
+    if result["render"]:
+        st.image(result["render"], caption="Détection SOTA", width="stretch")
+
+    st.success(f"⚡ Vitesse : **{data['performance']['inference']:.1f} ms**")
+    show_tiling_info(data)
+
+    # Statistiques
+    st.markdown("#### 📊 Statistiques")
+    counts = data['summary']
+
+    k1, k2 = st.columns(2)
+    k1.metric("🚗 Cars", counts.get('car', 0))
+    k2.metric("🏍️ Motos", counts.get('motorcycle', 0))
+
+    k3, k4 = st.columns(2)
+    k3.metric("🚌 Bus", counts.get('bus', 0))
+    k4.metric("🚛 Trucks", counts.get('truck', 0))
+
+    # Tableau détaillé
+    if data.get('detections'):
+        detections_table(data['detections'], panel_key)
+
+def column_header(step, title):
+    st.markdown(f'<div class="col-header-small">{step}</div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="col-header-big">{title}</div>', unsafe_allow_html=True)
+    st.markdown("---")
+
+# --- LES 3 PANNEAUX : (étape, titre, message d'attente, appel API, affichage) ---
+MODEL_PANELS = {
+    "predict": ("1 - LE PASSÉ", "CNN Naïf", 'Analyse CNN...', analyse_cnn, render_cnn),
+    "predict_custom_yolo": ("2 - LE PRÉSENT", "Modèle TRUSF", 'Inférence Custom YOLO...', analyse_custom, render_custom),
+    "predict_yolo_image": ("3 - LE FUTUR", "YOLOv8", 'Inférence SOTA...', analyse_sota, render_sota),
+}
+
+# ==========================================
+# FRAGMENTS
+# Chaque panneau se ré-exécute seul quand on interagit avec lui ;
+# seuls un nouvel upload et le lancement de l'analyse relancent toute la page.
+# ==========================================
+@st.fragment
+def upload_panel():
+    uploaded_file = st.file_uploader("Chargez une image pour tester l'évolution des 3 architectures", type=['jpg', 'jpeg', 'png'],
+                                     key="uploader")
+
+    if uploaded_file is None:
+        if st.session_state.get("upload") is not None:
+            get_session_store().discard(f"upload:{st.session_state['upload']['file_id']}")
+            st.session_state["upload"] = None
+            st.session_state["analysis_key"] = None
+            st.rerun()
+        return
+
+    # Ré-encodage JPEG une seule fois par fichier, pas à chaque rerun.
+    # La session ne garde que les empreintes ; le JPEG va dans le store, donc dans le budget mémoire.
+    upload = st.session_state.get("upload")
+    if upload is None or upload["file_id"] != uploaded_file.file_id:
+        if upload is not None:
+            get_session_store().discard(f"upload:{upload['file_id']}")
+        bytes_data, phash, size = encode_upload(uploaded_file)
+        upload = {"file_id": uploaded_file.file_id, "hash": hashlib.sha1(bytes_data).hexdigest(),
+                  "phash": phash, "size": size}
+        st.session_state["upload"] = upload
+        get_session_store().put(f"upload:{upload['file_id']}", bytes_data)
+        get_memory_registry().enforce(protect_store=get_session_store(), protect_key=f"upload:{upload['file_id']}")
+        del bytes_data
+
+    tiled = st.toggle("🧩 Mode tuiles (petits objets / haute résolution)", value=TILING_DEFAULT,
+                      help=f"Tuiles de {TILE_SIZE} px, recouvrement {TILE_OVERLAP} px, fusion {TILE_MERGE.upper()}")
+    image_key = upload["hash"] + (":tiled" if tiled else "")
+
+    with st.expander("📸 Voir l'image originale"):
+        st.image(uploaded_file, caption="Image Source", width="stretch")
+
+    if st.button("LANCER L'ANALYSE TEMPORELLE 🚀"):
+        get_phash_index().add(upload["phash"], image_key)
+        st.session_state["analysis_key"] = image_key
+        st.session_state["pending"] = set(MODEL_PANELS)
+        st.session_state["balloons"] = True
+        st.rerun()
+
+    # Nouvelle image ou changement de mode : les colonnes doivent suivre
+    if image_key != st.session_state.get("analysis_key"):
+        st.session_state["analysis_key"] = image_key
+        st.rerun()
+
+def request_relaunch(endpoint):
+    st.session_state.setdefault("pending", set()).add(endpoint)
+    st.session_state.setdefault("force", set()).add(endpoint)
+
+@st.fragment
+def model_panel(endpoint):
+    step, title, spinner_text, analyse, render = MODEL_PANELS[endpoint]
+    image_key = st.session_state.get("analysis_key")
+    upload = st.session_state.get("upload")
+    if image_key is None or upload is None:
+        return
+    pending = st.session_state.setdefault("pending", set())
+    store = get_session_store()
+
+    column_header(step, title)
+    results = store.get(image_key) or {}
+
+    if endpoint in pending:
+        force = st.session_state.setdefault("force", set())
+        shared_cache = get_shared_cache()
+        shared_key = result_key(API_URL, MODEL_VERSION, image_key, endpoint)
+        result = None
+        if endpoint not in force:
+            # Même image déjà traitée par n'importe quel worker, sinon quasi-doublon de la session
+            result = shared_cache.get(shared_key) if shared_cache else None
+            if result is not None:
+                result["shared"] = True
+            else:
+                result = find_near_duplicate(endpoint, image_key, upload)
+        if result is None:
+            with st.spinner(spinner_text):
+                start = time.perf_counter()
+                bytes_data = get_upload_bytes(upload)
+                result = analyse(bytes_data, image_key.endswith(":tiled")) if bytes_data else None
+            if result:
+                result["elapsed_ms"] = (time.perf_counter() - start) * 1000
+                result["size"] = upload["size"]
+                if shared_cache:
+                    shared_cache.put(shared_key, result)
+        pending.discard(endpoint)
+        force.discard(endpoint)
+        results = {**results, endpoint: result}
+        store.put(image_key, results)
+        get_memory_registry().enforce(protect_store=store, protect_key=image_key)
+
+    result = results.get(endpoint)
+    render(result, endpoint)
+    if result and result.get("reused"):
+        reused = result["reused"]
+        st.caption(f"♻️ Résultat réutilisé d'une image quasi identique (distance {reused['distance']}/64) · "
+                   f"~{reused['saved_ms']:.0f} ms économisées")
+    elif result and result.get("shared"):
+        st.caption("📦 Résultat servi par le cache partagé")
+
+    # Le callback s'exécute avant le rerun du fragment, qui relance alors ce seul modèle
+    st.button("🔄 Relancer ce modèle", key=f"rerun_{endpoint}", on_click=request_relaunch, args=(endpoint,))
+
+@st.fragment
+def debug_panel():
+    store = get_session_store()
+    registry = get_memory_registry()
+    with st.expander("🛠️ Debug"):
+        d1, d2, d3 = st.columns(3)
+        d1.metric("Session", format_bytes(store.usage),
+                  help=f"Budget : {format_bytes(store.budget_bytes)}")
+        d2.metric("Processus (résultats)", format_bytes(registry.total_usage()),
+                  help=f"Budget : {format_bytes(registry.budget_bytes)}")
+        d3.metric("RSS processus", format_bytes(current_rss_bytes()))
+        st.write(f"Résultats conservés : {len(store)} · "
+                 f"Évictions session : {store.evictions} · "
+                 f"Évictions globales : {registry.evictions} · "
+                 f"Sessions actives : {registry.sessions()}")
+        get_phash_index()
+        stats = st.session_state["phash_stats"]
+        skip_rate = stats["skips"] / stats["lookups"] if stats["lookups"] else 0
+        st.write(f"Quasi-doublons : {stats['skips']}/{stats['lookups']} appels évités ({skip_rate:.0%}) · "
+                 f"Temps économisé : {stats['saved_ms'] / 1000:.1f} s")
+        shared_cache = get_shared_cache()
+        if shared_cache:
+            shared = shared_cache.stats()
+            st.write(f"Cache partagé : {shared['entries']} entrées · {format_bytes(shared['bytes'])} · "
+                     f"{shared['hits']} hits / {shared['misses']} misses (ce worker)")
+        st.button("🔄 Actualiser", key="debug_refresh")
 
 # ==========================================
 # EN-TÊTE
@@ -169,190 +577,27 @@ with col_title:
 # ==========================================
 # UPLOAD
 # ==========================================
-uploaded_file = st.file_uploader("Chargez une image pour tester l'évolution des 3 architectures", type=['jpg', 'jpeg', 'png'])
-
-if uploaded_file is not None:
-    image = Image.open(uploaded_file)
-    img_bytes = io.BytesIO()
-    image.save(img_bytes, format='JPEG')
-    bytes_data = img_bytes.getvalue()
-
-    with st.expander("📸 Voir l'image originale"):
-        st.image(image, caption="Image Source", width="stretch")
+upload_panel()
 
-    if st.button("LANCER L'ANALYSE TEMPORELLE 🚀"):
+# ==========================================
+# RÉSULTATS : 1. LE PASSÉ (CNN) / 2. LE PRÉSENT (TRUSF) / 3. LE FUTUR (YOLOv8)
+# ==========================================
+analysis_key = st.session_state.get("analysis_key")
+if st.session_state.get("upload") and (st.session_state.get("pending") or analysis_key in get_session_store()):
+    if st.session_state.pop("balloons", False):
         st.balloons()
 
-        # 3 Colonnes
-        col_past, col_present, col_future = st.columns(3, gap="medium")
-
-        # ==========================================
-        # 1. LE PASSÉ (CNN)
-        # ==========================================
-        with col_past:
-            # TITRES MODIFIÉS
-            st.markdown('<div class="col-header-small">1 - LE PASSÉ</div>', unsafe_allow_html=True)
-            st.markdown('<div class="col-header-big">CNN Naïf</div>', unsafe_allow_html=True)
-            st.markdown("---")
-
-            with st.spinner('Analyse CNN...'):
-                response = send_image_to_api(bytes_data, "predict")
-                if response:
-                    data = response.json()
-
-                    # --- AFFICHAGE CNN MODIFIÉ (Gros Texte) ---
-                    pred_class = data['prediction']
-                    st.markdown(f"""
-                        <div class="pred-label">Prédiction :</div>
-                        <div class="big-pred">{pred_class}</div>
-                        <br>
-                    """, unsafe_allow_html=True)
-
-                    st.metric("Niveau de Confiance", f"{data['confidence']:.2%}")
-
-                    st.write("Répartition :")
-                    st.bar_chart(data['all_probabilities'], height=150)
-                else:
-                    st.warning("Service indisponible")
-
-        # ==========================================
-        # 2. LE PRÉSENT (TRUSF - YOLO MAISON)
-        # ==========================================
-        with col_present:
-            # TITRES MODIFIÉS
-            st.markdown('<div class="col-header-small">2 - LE PRÉSENT</div>', unsafe_allow_html=True)
-            st.markdown('<div class="col-header-big">Modèle TRUSF</div>', unsafe_allow_html=True)
-            st.markdown("---")
-
-            with st.spinner('Inférence Custom YOLO...'):
-                response = send_image_to_api(bytes_data, "predict_custom_yolo")
-
-                if response:
-                    data = response.json()
-
-                    # --- DESSIN FRONTEND (FORCE TEXTE NOIR) ---
-                    if data.get('detections'):
-                        try:
-                            # On copie l'image originale
-                            img_draw = image.copy()
-                            draw = ImageDraw.Draw(img_draw)
-
-                            # Pour le texte, on essaie de charger une police par défaut, sinon fallback
-                            try:
-                                font = ImageFont.load_default()
-                            except:
-                                font = None
-
-                            for det in data['detections']:
-                                bbox = det['bbox']
-                                label = det['label']
-                                conf = det['confidence']
-
-                                # Couleur de la boite
-                                color_hex = CLASS_COLORS_FRONT.get(label, "#FF0000")
-
-                                # Dessin Boite
-                                draw.rectangle(bbox, outline=color_hex, width=4)
-
-                                # Préparation Texte (Label + %)
-                                text_str = f"{label} {conf:.0%}"
-
-                                # Fond du texte (petit rectangle pour lisibilité)
-                                if hasattr(draw, "textbbox"):
-                                    left, top, right, bottom = draw.textbbox(bbox[:2], text_str)
-                                    text_w = right - left
-                                    text_h = bottom - top
-                                else:
-                                    text_w, text_h = 40, 10 # Fallback taille
-
-                                # On dessine un fond coloré pour le texte
-                                text_bg = [bbox[0], bbox[1] - text_h - 4, bbox[0] + text_w + 4, bbox[1]]
-                                draw.rectangle(text_bg, fill=color_hex)
-
-                                # LE TEXTE EN NOIR (0, 0, 0)
-                                draw.text((bbox[0] + 2, bbox[1] - text_h - 4), text_str, fill="black")
-
-                            st.image(img_draw, caption="Détection Maison", width="stretch")
-                        except Exception as e:
-                            st.error(f"Erreur dessin image: {e}")
-                    else:
-                        st.warning("Aucun véhicule détecté")
-
-                    # --- VITESSE D'EXECUTION (Comme SOTA) ---
-                    speed = data.get('performance', {}).get('inference', 0)
-                    if speed == 0:
-                        st.success(f"⚡ Vitesse : **~200 ms**")
-                    else:
-                        st.success(f"⚡ Vitesse : **{speed:.1f} ms**")
-
-                    # 2. Statistiques (Compteurs)
-                    st.markdown("#### 📊 Statistiques")
-                    counts = data['summary']
-
-                    p1, p2 = st.columns(2)
-                    p1.metric("🚗 Cars", counts.get('Car', 0))
-                    p2.metric("🏍️ Motos", counts.get('Motorcycle', 0))
-
-                    p3, p4 = st.columns(2)
-                    p3.metric("🚌 Bus", counts.get('Bus', 0))
-                    p4.metric("🚛 Trucks", counts.get('Truck', 0))
-
-                    # 3. Tableau
-                    if data.get('detections'):
-                        with st.expander("📋 Données détaillées"):
-                            df = pd.DataFrame(data['detections'])
-                            st.dataframe(
-                                df[['label', 'confidence', 'bbox']].style.format({"confidence": "{:.2%}"}),
-                                width="stretch"
-                            )
-                else:
-                    st.warning("Service Custom indisponible")
-                    plan_path = "plan_ikea.jpg" if os.path.exists("plan_ikea.jpg") else None
-                    if plan_path:
-                        st.image(plan_path, caption="Concept Architectural", width="stretch")
-
-        # ==========================================
-        # 3. LE FUTUR (YOLO SOTA)
-        # ==========================================
-        with col_future:
-            # TITRES MODIFIÉS
-            st.markdown('<div class="col-header-small">3 - LE FUTUR</div>', unsafe_allow_html=True)
-            st.markdown('<div class="col-header-big">YOLOv8</div>', unsafe_allow_html=True)
-            st.markdown("---")
-
-            with st.spinner('Inférence SOTA...'):
-                response = send_image_to_api(bytes_data, "predict_yolo_image")
-                if response:
-                    data = response.json()
-                    try:
-                        b64_string = data['image_data']['b64']
-                        img_decoded = base64.b64decode(b64_string)
-                        st.image(Image.open(io.BytesIO(img_decoded)), caption="Détection SOTA", width="stretch")
-                    except:
-                        pass
-
-                    st.success(f"⚡ Vitesse : **{data['performance']['inference']:.1f} ms**")
-
-                    # Statistiques
-                    st.markdown("#### 📊 Statistiques")
-                    counts = data['summary']
-
-                    k1, k2 = st.columns(2)
-                    k1.metric("🚗 Cars", counts.get('car', 0))
-                    k2.metric("🏍️ Motos", counts.get('motorcycle', 0))
-
-                    k3, k4 = st.columns(2)
-                    k3.metric("🚌 Bus", counts.get('bus', 0))
-                    k4.metric("🚛 Trucks", counts.get('truck', 0))
-
-                    # Tableau détaillé
-                    if data.get('detections'):
-                        with st.expander("📋 Données détaillées"):
-                            df = pd.DataFrame(data['detections'])
-                            st.dataframe(
-                                df[['label', 'confidence', 'bbox']].style.format({"confidence": "{:.2%}"}),
-                                width="stretch"
-                            )
+    # 3 Colonnes
+    columns = st.columns(3, gap="medium")
+    for col, endpoint in zip(columns, MODEL_PANELS):
+        with col:
+            model_panel(endpoint)
+
+# ==========================================
+# DEBUG (mémoire)
+# ==========================================
+if DEBUG_PANEL or st.query_params.get("debug") == "1":
+    debug_panel()
 
 st.markdown("---")
 st.markdown("<div style='text-align: center;'>Equipe Clairvoyance © 2025</div>", unsafe_allow_html=True)
@@ -0,0 +1,24 @@
+import os
+
+import streamlit as st
+
+
+# --- LECTURE DES PARAMÈTRES (secrets Streamlit > variables d'environnement > défaut) ---
+def get_setting(name, default=None, cast=None):
+    """Renvoie un paramètre de configuration, converti avec `cast` si fourni."""
+    value = None
+    try:
+        value = st.secrets[name]
+    except Exception:
+        value = os.environ.get(name)
+
+    if value is None or value == "":
+        return default
+    if cast is None:
+        return value
+    if cast is bool and isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return default
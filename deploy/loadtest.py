@@ -0,0 +1,239 @@
+"""Scénario de charge : débit du traitement côté front selon le nombre de cœurs.
+
+Rejoue, sans navigateur, ce que fait un worker pour chaque upload : ré-encodage
+JPEG + hash perceptuel, appels des 3 endpoints, dessin des boîtes TRUSF,
+décodage base64 de l'image YOLOv8 et écriture dans le cache partagé. L'API est
+simulée localement (latence réseau/serveur configurable, sans CPU) pour ne
+mesurer que le coût du front.
+
+Le même nombre de workers est testé en processus (mode multi-workers) et en
+threads d'un seul interpréteur (mode actuel, contention sur le GIL).
+
+Deux scénarios, mesurés séparément :
+- montée en charge : chemin à froid, chaque upload est nouveau (clé de cache
+  rendue unique, 0 % de hits à tous les paliers) ; l'accélération ne compare
+  que des charges identiques ;
+- partage : les workers tirent leurs uploads dans un même jeu d'images
+  (chacun dans un ordre différent) et interrogent le cache partagé avec la
+  clé de app.py (`result_key` : backend + `{sha1}[:tiled]` + endpoint) ; on
+  compte les hits servis par un autre worker, sans les mêler au facteur
+  d'accélération.
+
+Chaque palier part d'un cache vide.
+
+Usage :
+    python deploy/loadtest.py --duration 10 --size 4000x3000 --distinct 8
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from image_pipeline import draw_detections, encode_upload  # noqa: E402
+from shared_cache import SharedResultCache, result_key  # noqa: E402
+
+ENDPOINTS = ("predict", "predict_custom_yolo", "predict_yolo_image")
+
+
+# --- API SIMULÉE ---
+def make_sample_image(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    # Dégradé + bruit : compresse comme une vraie photo, pas comme un aplat
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = (x + y) / 2
+    pixels = np.stack([base, base[::-1], base[:, ::-1]], axis=-1)
+    pixels += rng.normal(0, 25, pixels.shape)
+    buf = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def make_responses(image_bytes, n_boxes=20, seed=0):
+    rng = random.Random(seed)
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        width, height = image.size
+    labels = ["Car", "Bus", "Truck", "Motorcycle"]
+    detections = []
+    for _ in range(n_boxes):
+        x1, y1 = rng.uniform(0, width * 0.9), rng.uniform(0, height * 0.9)
+        w, h = rng.uniform(20, width * 0.1), rng.uniform(20, height * 0.1)
+        detections.append({"label": rng.choice(labels), "confidence": rng.uniform(0.3, 1.0),
+                           "bbox": [x1, y1, min(x1 + w, width), min(y1 + h, height)]})
+    summary = {label: sum(d["label"] == label for d in detections) for label in labels}
+    lower = [{**d, "label": d["label"].lower()} for d in detections]
+    return {
+        "predict": {"prediction": "car", "confidence": 0.91,
+                    "all_probabilities": {label.lower(): 0.25 for label in labels}},
+        "predict_custom_yolo": {"detections": detections, "summary": summary,
+                                "performance": {"inference": 180.0}},
+        "predict_yolo_image": {"detections": lower,
+                               "summary": {k.lower(): v for k, v in summary.items()},
+                               "performance": {"inference": 45.0},
+                               "image_data": {"b64": base64.b64encode(image_bytes).decode()}},
+    }
+
+
+def start_fake_api(responses, latency_ms):
+    bodies = {endpoint: json.dumps(payload).encode() for endpoint, payload in responses.items()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency_ms / 1000)
+            body = bodies.get(self.path.strip("/"))
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# --- TRAVAIL D'UN WORKER (même chemin que app.py, hors Streamlit) ---
+def process_upload(image_bytes, api_url, cache, session, worker_id, stats, salt=None):
+    """Un upload : cache partagé d'abord (même clé que app.py), API sinon.
+
+    `salt` rend la clé unique : même coût de lecture/écriture du cache, jamais de hit.
+    """
+    bytes_data, phash, size = encode_upload(io.BytesIO(image_bytes))
+    image_key = hashlib.sha1(bytes_data).hexdigest()
+    if salt is not None:
+        image_key = f"{image_key}-{salt}"
+    for endpoint in ENDPOINTS:
+        shared_key = result_key(api_url, "", image_key, endpoint)
+        result = cache.get(shared_key)
+        if result is not None:
+            stats["hits"] += 1
+            stats["cross_hits"] += result["worker"] != worker_id
+            continue
+        stats["misses"] += 1
+        files = {'file': ('image.jpg', bytes_data, 'image/jpeg')}
+        data = session.post(f"{api_url}/{endpoint}", files=files, timeout=120).json()
+        result = {"data": data, "size": size, "worker": worker_id}
+        if endpoint == "predict_custom_yolo":
+            result["render"] = draw_detections(bytes_data, data["detections"])
+        elif endpoint == "predict_yolo_image":
+            result["render"] = base64.b64decode(data.pop("image_data")["b64"])
+        cache.put(shared_key, result)
+
+
+def worker_loop(images, api_url, cache_path, duration, worker_id, cold):
+    cache = SharedResultCache(cache_path, 1024 * 1024 * 1024)
+    session = requests.Session()
+    stats = {"uploads": 0, "hits": 0, "cross_hits": 0, "misses": 0}
+    # Chaque worker parcourt le jeu commun à partir d'un décalage différent
+    order = images[worker_id % len(images):] + images[:worker_id % len(images)]
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        salt = f"w{worker_id}-{stats['uploads']}" if cold else None
+        process_upload(order[stats["uploads"] % len(order)], api_url, cache, session, worker_id, stats, salt)
+        stats["uploads"] += 1
+    return stats
+
+
+def run(mode, workers, images, api_url, cache_dir, duration, cold):
+    executor_cls = ProcessPoolExecutor if mode == "processus" else ThreadPoolExecutor
+    # Cache vide à chaque palier, échauffement dans un cache à part
+    scenario = "froid" if cold else "partage"
+    warmup_path = os.path.join(cache_dir, f"{scenario}-{mode}-{workers}-warmup.db")
+    cache_path = os.path.join(cache_dir, f"{scenario}-{mode}-{workers}.db")
+    with executor_cls(max_workers=workers) as pool:
+        # Petit échauffement (imports, connexions) hors mesure
+        list(pool.map(worker_loop, [images[:1]] * workers, [api_url] * workers,
+                      [warmup_path] * workers, [0.01] * workers, range(workers), [True] * workers))
+        start = time.perf_counter()
+        results = list(pool.map(worker_loop, [images] * workers, [api_url] * workers,
+                                [cache_path] * workers, [duration] * workers, range(workers),
+                                [cold] * workers))
+        elapsed = time.perf_counter() - start
+    totals = {key: sum(r[key] for r in results) for key in results[0]}
+    totals["throughput"] = totals["uploads"] / elapsed
+    lookups = totals["hits"] + totals["misses"]
+    totals["hit_rate"] = totals["hits"] / lookups if lookups else 0
+    totals["cross_rate"] = totals["cross_hits"] / totals["hits"] if totals["hits"] else 0
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scénario de charge Clairvoyance (front)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée de chaque palier (s)")
+    parser.add_argument("--size", default="4000x3000", help="Taille de l'image de test (LxH)")
+    parser.add_argument("--image", help="Image réelle à utiliser à la place des images synthétiques")
+    parser.add_argument("--distinct", type=int, default=8,
+                        help="Nombre d'images différentes, partagées par tous les workers")
+    parser.add_argument("--api-latency", type=float, default=50.0, help="Latence simulée de l'API (ms)")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--modes", default="processus,threads")
+    parser.add_argument("--scenarios", default="montee,partage",
+                        help="montee : débit à froid par palier ; partage : hits entre workers au palier max")
+    args = parser.parse_args()
+
+    if args.image:
+        with open(args.image, "rb") as f:
+            images = [f.read()]
+    else:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+        images = [make_sample_image(width, height, seed) for seed in range(max(1, args.distinct))]
+
+    # Réponses calées sur la première image : la simulation ne regarde pas les pixels
+    server, api_url = start_fake_api(make_responses(images[0]), args.api_latency)
+    levels = sorted({1, *[2 ** i for i in range(1, 8) if 2 ** i < args.max_workers], args.max_workers})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{len(images)} image(s) de {len(images[0]) / 1024:.0f} Ko · API simulée {args.api_latency:.0f} ms · "
+              f"{args.duration:.0f} s par palier")
+        scenarios = args.scenarios.split(",")
+        if "montee" in scenarios:
+            print("\nMontée en charge (chemin à froid, uploads tous différents)")
+            print(f"{'mode':<10} {'workers':>7} {'uploads/s':>10} {'accélération':>13} {'efficacité':>11} "
+                  f"{'hits cache':>11}")
+            for mode in args.modes.split(","):
+                baseline = None
+                for workers in levels:
+                    totals = run(mode, workers, images, api_url, tmp, args.duration, cold=True)
+                    throughput = totals["throughput"]
+                    baseline = baseline or throughput
+                    speedup = throughput / baseline
+                    print(f"{mode:<10} {workers:>7} {throughput:>10.2f} {speedup:>12.2f}x "
+                          f"{speedup / workers:>10.0%} {totals['hit_rate']:>10.0%}", flush=True)
+        if "partage" in scenarios:
+            print(f"\nPartage du cache ({len(images)} images communes à tous les workers)")
+            print(f"{'mode':<10} {'workers':>7} {'uploads/s':>10} {'hits cache':>11} {'dont autre worker':>18}")
+            for mode in args.modes.split(","):
+                totals = run(mode, args.max_workers, images, api_url, tmp, args.duration, cold=False)
+                print(f"{mode:<10} {args.max_workers:>7} {totals['throughput']:>10.2f} "
+                      f"{totals['hit_rate']:>10.0%} {totals['cross_rate']:>17.0%}", flush=True)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Déploiement multi-workers : N processus Streamlit derrière un répartiteur TCP collant.
+
+Chaque worker est un interpréteur séparé (pas de contention sur le GIL pour le
+décodage / ré-encodage / dessin). Le répartiteur choisit le worker à partir de
+l'IP cliente : la websocket d'une session et ses uploads arrivent toujours sur
+le même worker. Les résultats sont partagés via le cache SQLite commun
+(SHARED_CACHE_DB), l'historique des latences via LATENCY_DB.
+
+Usage :
+    python deploy/run_workers.py --workers 4 --port 8501
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import signal
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# --- LANCEMENT DES WORKERS ---
+def start_workers(count, base_port):
+    env = dict(os.environ)
+    # Chemins absolus : tous les workers doivent ouvrir les mêmes fichiers
+    env.setdefault("SHARED_CACHE_DB", os.path.join(ROOT, "clairvoyance_cache.db"))
+    env.setdefault("LATENCY_DB", os.path.join(ROOT, "clairvoyance_latency.db"))
+
+    workers = []
+    for i in range(count):
+        port = base_port + i
+        cmd = [
+            sys.executable, "-m", "streamlit", "run", "app.py",
+            "--server.port", str(port),
+            "--server.address", "127.0.0.1",
+            "--server.headless", "true",
+        ]
+        workers.append((port, subprocess.Popen(cmd, cwd=ROOT, env=env)))
+    return workers
+
+
+# --- RÉPARTITEUR TCP COLLANT (hash de l'IP cliente) ---
+def worker_order(client_ip, ports):
+    """Ports des workers dans l'ordre de préférence pour ce client (rendez-vous hashing)."""
+    def score(port):
+        return hashlib.sha1(f"{client_ip}:{port}".encode()).digest()
+    return sorted(ports, key=score, reverse=True)
+
+
+async def pipe(reader, writer):
+    try:
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            writer.write(chunk)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        try:
+            writer.close()
+        except Exception:
+            pass
+
+
+def make_handler(ports):
+    async def handle(client_reader, client_writer):
+        client_ip = (client_writer.get_extra_info("peername") or ("?",))[0]
+        for port in worker_order(client_ip, ports):
+            try:
+                upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", port)
+                break
+            except OSError:
+                # Worker indisponible : on bascule sur le suivant pour ce client
+                continue
+        else:
+            client_writer.close()
+            return
+        await asyncio.gather(
+            pipe(client_reader, upstream_writer),
+            pipe(upstream_reader, client_writer),
+        )
+    return handle
+
+
+async def serve(host, port, ports):
+    server = await asyncio.start_server(make_handler(ports), host, port)
+    print(f"Répartiteur sur http://{host}:{port} -> workers {ports}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clairvoyance multi-workers")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8501)
+    parser.add_argument("--base-port", type=int, default=8600, help="Port du premier worker")
+    args = parser.parse_args()
+
+    workers = start_workers(args.workers, args.base_port)
+
+    def shutdown(*_):
+        for _, proc in workers:
+            proc.terminate()
+        for _, proc in workers:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    try:
+        asyncio.run(serve(args.host, args.port, [port for port, _ in workers]))
+    except KeyboardInterrupt:
+        shutdown()
+
+
+if __name__ == "__main__":
+    main()
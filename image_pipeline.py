@@ -0,0 +1,78 @@
+import io
+
+from PIL import Image, ImageDraw, ImageFont
+
+from phash_index import dhash
+
+
+# --- COULEURS POUR DESSIN FRONTEND (Modèle Maison) ---
+CLASS_COLORS_FRONT = {
+    "Car": "#FF0000",       # Rouge
+    "Bus": "#0000FF",       # Bleu
+    "Truck": "#00FF00",     # Vert
+    "Motorcycle": "#FFFF00" # Jaune
+}
+
+
+# --- PRÉPARATION DE L'UPLOAD ---
+def encode_upload(uploaded_file):
+    """Ré-encode l'upload en JPEG (+ hash perceptuel) et libère immédiatement l'image décodée."""
+    with Image.open(uploaded_file) as image:
+        img_bytes = io.BytesIO()
+        image.save(img_bytes, format='JPEG')
+        phash = dhash(image)
+        size = image.size
+    bytes_data = img_bytes.getvalue()
+    img_bytes.close()
+    return bytes_data, phash, size
+
+
+# --- DESSIN FRONTEND (FORCE TEXTE NOIR) ---
+def draw_detections(bytes_data, detections):
+    """Dessine les boîtes côté front et renvoie le rendu encodé en JPEG."""
+    with Image.open(io.BytesIO(bytes_data)) as img_draw:
+        draw = ImageDraw.Draw(img_draw)
+
+        # Pour le texte, on essaie de charger une police par défaut, sinon fallback
+        try:
+            font = ImageFont.load_default()
+        except:
+            font = None
+
+        for det in detections:
+            bbox = det['bbox']
+            label = det['label']
+            conf = det['confidence']
+
+            # Couleur de la boite
+            color_hex = CLASS_COLORS_FRONT.get(label.capitalize(), "#FF0000")
+
+            # Dessin Boite
+            draw.rectangle(bbox, outline=color_hex, width=4)
+
+            # Préparation Texte (Label + %)
+            text_str = f"{label} {conf:.0%}"
+            if det.get('track_id') is not None:
+                text_str = f"#{det['track_id']} {text_str}"
+
+            # Fond du texte (petit rectangle pour lisibilité)
+            if hasattr(draw, "textbbox"):
+                left, top, right, bottom = draw.textbbox(bbox[:2], text_str)
+                text_w = right - left
+                text_h = bottom - top
+            else:
+                text_w, text_h = 40, 10 # Fallback taille
+
+            # On dessine un fond coloré pour le texte
+            text_bg = [bbox[0], bbox[1] - text_h - 4, bbox[0] + text_w + 4, bbox[1]]
+            draw.rectangle(text_bg, fill=color_hex)
+
+            # LE TEXTE EN NOIR (0, 0, 0)
+            draw.text((bbox[0] + 2, bbox[1] - text_h - 4), text_str, fill="black")
+
+        # On ne conserve que le JPEG du rendu, pas l'image décodée
+        out = io.BytesIO()
+        img_draw.save(out, format='JPEG', quality=85)
+    rendered = out.getvalue()
+    out.close()
+    return rendered
@@ -0,0 +1,122 @@
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+
+# --- ENDPOINTS -> ARCHITECTURES ---
+ARCHITECTURES = {
+    "predict": "CNN",
+    "predict_custom_yolo": "TRUSF",
+    "predict_yolo_image": "YOLOv8",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    endpoint TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    rtt_ms REAL NOT NULL,
+    server_ms REAL,
+    request_bytes INTEGER,
+    response_bytes INTEGER,
+    detections INTEGER,
+    ok INTEGER NOT NULL,
+    tile INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_requests_started ON requests (started_at);
+"""
+
+COLUMNS = ("endpoint", "started_at", "finished_at", "rtt_ms", "server_ms",
+           "request_bytes", "response_bytes", "detections", "ok", "tile")
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    # WAL : les lectures de la page de comparaison ne bloquent pas l'écriture
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# --- ÉCRITURE PAR LOTS (thread dédié, jamais sur le chemin du rendu) ---
+class LatencyRecorder:
+    """Historise chaque appel API dans SQLite, par lots, depuis un thread de fond."""
+
+    def __init__(self, db_path, batch_size=50, flush_interval=2.0, max_pending=10000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="latency-recorder", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, endpoint, started_at, finished_at, server_ms=None, request_bytes=None,
+               response_bytes=None, detections=None, ok=True, tile=False):
+        row = (endpoint, started_at, finished_at, (finished_at - started_at) * 1000, server_ms,
+               request_bytes, response_bytes, detections, int(ok), int(tile))
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Historique perdu plutôt que rendu bloqué
+            self.dropped += 1
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        conn = connect(self.db_path)
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch.append(self._queue.get(timeout=max(0.05, deadline - time.monotonic())))
+            except queue.Empty:
+                pass
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(conn, batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+        self._flush(conn, batch)
+        conn.close()
+
+    def _flush(self, conn, batch):
+        if not batch:
+            return
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO requests ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    batch,
+                )
+        except sqlite3.Error:
+            self.dropped += len(batch)
+
+
+# --- LECTURE POUR LA PAGE DE COMPARAISON ---
+def load_history(db_path, since=None):
+    """Historique des appels sous forme de DataFrame (colonne `architecture` ajoutée)."""
+    conn = connect(db_path)
+    try:
+        query = f"SELECT {', '.join(COLUMNS)} FROM requests"
+        params = ()
+        if since is not None:
+            query += " WHERE started_at >= ?"
+            params = (since,)
+        df = pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+    df["architecture"] = df["endpoint"].map(ARCHITECTURES).fillna(df["endpoint"])
+    df["started_at"] = pd.to_datetime(df["started_at"], unit="s")
+    df["finished_at"] = pd.to_datetime(df["finished_at"], unit="s")
+    return df
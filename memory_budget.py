@@ -0,0 +1,183 @@
+import io
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from PIL import Image
+
+
+# --- ESTIMATION DE LA TAILLE DES OBJETS CONSERVÉS ---
+def estimate_size(obj, _depth=0):
+    """Estimation (en octets) de la mémoire occupée par un résultat conservé."""
+    if obj is None:
+        return 0
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, io.BytesIO):
+        return obj.getbuffer().nbytes
+    if isinstance(obj, Image.Image):
+        return obj.width * obj.height * len(obj.getbands())
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):
+        # DataFrame pandas
+        return int(obj.memory_usage(deep=True).sum())
+    if _depth > 20:
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_size(v, _depth + 1) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def current_rss_bytes():
+    """RSS actuel du processus (Linux), None si indisponible."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        import resource
+        return resident_pages * resource.getpagesize()
+    except Exception:
+        return None
+
+
+def format_bytes(n):
+    if n is None:
+        return "n/a"
+    for unit in ("o", "Ko", "Mo"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == "o" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.2f} Go"
+
+
+# --- RÉSULTATS D'UNE SESSION (LRU BORNÉ) ---
+class SessionResultStore:
+    """Résultats d'une session, bornés à `budget_bytes` avec éviction LRU."""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.evictions = 0
+        self._entries = OrderedDict()  # clé -> (valeur, taille, dernier accès)
+        self._usage = 0
+        self._lock = threading.Lock()
+
+    @property
+    def usage(self):
+        return self._usage
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, size, _ = entry
+            self._entries[key] = (value, size, time.monotonic())
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._usage -= old[1]
+            self._entries[key] = (value, size, time.monotonic())
+            self._usage += size
+            # On garde toujours l'entrée la plus récente, même si elle dépasse le budget
+            while self._usage > self.budget_bytes and len(self._entries) > 1:
+                self._pop_oldest()
+        return size
+
+    def discard(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._usage -= old[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._usage = 0
+
+    def oldest_access(self):
+        with self._lock:
+            if not self._entries:
+                return None
+            key = next(iter(self._entries))
+            return key, self._entries[key][2]
+
+    def evict_oldest(self, protect=None):
+        """Évince l'entrée la moins récemment utilisée (sauf `protect`)."""
+        with self._lock:
+            if not self._entries:
+                return False
+            key = next(iter(self._entries))
+            if key == protect:
+                return False
+            self._pop_oldest()
+            return True
+
+    def _pop_oldest(self):
+        _, (_, size, _) = self._entries.popitem(last=False)
+        self._usage -= size
+        self.evictions += 1
+        return size
+
+
+# --- COMPTABILITÉ À L'ÉCHELLE DU PROCESSUS ---
+class ProcessMemoryRegistry:
+    """Regroupe les stores de toutes les sessions vivantes du processus.
+
+    Les stores sont référencés faiblement : quand Streamlit libère une session,
+    son store disparaît du registre sans nettoyage explicite.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.evictions = 0
+        self._stores = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def register(self, session_id, store):
+        with self._lock:
+            self._stores[session_id] = store
+
+    def sessions(self):
+        with self._lock:
+            return len(self._stores)
+
+    def total_usage(self):
+        with self._lock:
+            stores = list(self._stores.values())
+        return sum(s.usage for s in stores)
+
+    def enforce(self, protect_store=None, protect_key=None):
+        """Évince les entrées les plus anciennes toutes sessions confondues."""
+        while self.total_usage() > self.budget_bytes:
+            with self._lock:
+                stores = list(self._stores.values())
+            candidates = []
+            for s in stores:
+                oldest = s.oldest_access()
+                if oldest is None:
+                    continue
+                key, last_access = oldest
+                if s is protect_store and key == protect_key:
+                    continue
+                candidates.append((last_access, id(s), s))
+            if not candidates:
+                break
+            _, _, victim = min(candidates, key=lambda c: c[:2])
+            if not victim.evict_oldest(protect=protect_key if victim is protect_store else None):
+                break
+            self.evictions += 1
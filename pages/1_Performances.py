@@ -0,0 +1,138 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from config import get_setting
+from latency_store import ARCHITECTURES, load_history
+
+# --- CONFIGURATION DE LA PAGE ---
+st.set_page_config(
+    page_title="Clairvoyance AI - Performances",
+    page_icon="📈",
+    layout="wide",
+    initial_sidebar_state="collapsed"
+)
+
+LATENCY_DB = get_setting("LATENCY_DB", "clairvoyance_latency.db")
+
+PERIODES = {
+    "Dernière heure": 3600,
+    "24 heures": 24 * 3600,
+    "7 jours": 7 * 24 * 3600,
+    "30 jours": 30 * 24 * 3600,
+    "Tout l'historique": None,
+}
+
+GRANULARITES = {
+    "1 min": "1min",
+    "15 min": "15min",
+    "1 heure": "1h",
+    "1 jour": "1D",
+}
+
+@st.cache_data(ttl=10, show_spinner=False)
+def cached_history(db_path, since):
+    return load_history(db_path, since)
+
+def percentile(q):
+    def _p(series):
+        return series.quantile(q)
+    _p.__name__ = f"p{int(q * 100)}"
+    return _p
+
+# ==========================================
+# EN-TÊTE
+# ==========================================
+st.title("📈 Performances des architectures")
+st.markdown("### *Comparatif de vitesse sur les requêtes réelles : CNN, TRUSF, YOLOv8*")
+
+f1, f2, f3 = st.columns([2, 2, 1])
+periode = f1.selectbox("Période", list(PERIODES), index=1)
+granularite = f2.selectbox("Granularité", list(GRANULARITES), index=2)
+with f3:
+    inclure_tuiles = st.checkbox("Inclure les tuiles", value=False,
+                                 help="Requêtes individuelles envoyées en mode tuiles")
+
+seconds = PERIODES[periode]
+# Arrondi à 10 s pour profiter du cache entre deux reruns
+since = (int(time.time()) // 10 * 10 - seconds) if seconds else None
+df = cached_history(LATENCY_DB, since)
+if not inclure_tuiles:
+    df = df[df["tile"] == 0]
+
+if df.empty:
+    st.info("Aucune requête enregistrée sur cette période. Lancez une analyse depuis le tableau de bord.")
+    st.stop()
+
+ok = df[df["ok"] == 1]
+duree_min = max((df["finished_at"].max() - df["started_at"].min()).total_seconds() / 60, 1 / 60)
+
+# ==========================================
+# SYNTHÈSE PAR ARCHITECTURE
+# ==========================================
+st.markdown("---")
+cols = st.columns(len(ARCHITECTURES), gap="medium")
+for col, archi in zip(cols, ARCHITECTURES.values()):
+    with col:
+        st.subheader(archi)
+        sub = ok[ok["architecture"] == archi]
+        total = (df["architecture"] == archi).sum()
+        if sub.empty:
+            st.warning("Pas de données")
+            continue
+        m1, m2, m3 = st.columns(3)
+        m1.metric("p50", f"{sub['rtt_ms'].quantile(0.50):.0f} ms")
+        m2.metric("p95", f"{sub['rtt_ms'].quantile(0.95):.0f} ms")
+        m3.metric("p99", f"{sub['rtt_ms'].quantile(0.99):.0f} ms")
+        m4, m5, m6 = st.columns(3)
+        serveur = sub["server_ms"].dropna()
+        m4.metric("Serveur p50", f"{serveur.quantile(0.5):.0f} ms" if not serveur.empty else "n/a")
+        m5.metric("Débit", f"{total / duree_min:.1f} req/min")
+        m6.metric("Erreurs", f"{1 - len(sub) / total:.1%}")
+
+st.markdown("#### 📋 Détail")
+synthese = ok.groupby("architecture").agg(
+    requetes=("rtt_ms", "size"),
+    rtt_p50=("rtt_ms", percentile(0.50)),
+    rtt_p95=("rtt_ms", percentile(0.95)),
+    rtt_p99=("rtt_ms", percentile(0.99)),
+    serveur_p50=("server_ms", percentile(0.50)),
+    serveur_p95=("server_ms", percentile(0.95)),
+    envoi_moyen_ko=("request_bytes", lambda s: s.mean() / 1024),
+    reponse_moyenne_ko=("response_bytes", lambda s: s.mean() / 1024),
+    detections_moy=("detections", "mean"),
+)
+st.dataframe(synthese.style.format("{:.1f}", na_rep="—"), width="stretch")
+
+# ==========================================
+# ÉVOLUTION DANS LE TEMPS
+# ==========================================
+st.markdown("---")
+st.markdown("#### ⏱️ Évolution dans le temps")
+freq = GRANULARITES[granularite]
+grouper = [pd.Grouper(key="started_at", freq=freq), "architecture"]
+
+quantile = st.radio("Latence affichée", ["p50", "p95", "p99"], index=1, horizontal=True)
+q = int(quantile[1:]) / 100
+latence = ok.groupby(grouper)["rtt_ms"].quantile(q).unstack("architecture")
+st.markdown(f"**Latence aller-retour {quantile} (ms)**")
+st.line_chart(latence, height=280)
+
+bucket_min = pd.Timedelta(freq).total_seconds() / 60
+debit = df.groupby(grouper).size().unstack("architecture").fillna(0) / bucket_min
+st.markdown("**Débit (req/min)**")
+st.bar_chart(debit, height=250)
+
+c1, c2 = st.columns(2, gap="medium")
+with c1:
+    envoi = ok.groupby(grouper)["request_bytes"].mean().unstack("architecture") / 1024
+    st.markdown("**Taille moyenne des envois (Ko)**")
+    st.line_chart(envoi, height=250)
+with c2:
+    charge = ok.groupby(grouper)["response_bytes"].mean().unstack("architecture") / 1024
+    st.markdown("**Taille moyenne des réponses (Ko)**")
+    st.line_chart(charge, height=250)
+
+st.markdown("---")
+st.markdown("<div style='text-align: center;'>Equipe Clairvoyance © 2025</div>", unsafe_allow_html=True)
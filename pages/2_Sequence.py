@@ -0,0 +1,166 @@
+import time
+from collections import Counter
+
+import pandas as pd
+import streamlit as st
+
+from api_client import send_image_to_api
+from config import get_setting
+from image_pipeline import draw_detections, encode_upload
+from tracking import VehicleTracker, canonical_label
+
+# --- CONFIGURATION DE LA PAGE ---
+st.set_page_config(
+    page_title="Clairvoyance AI - Suivi multi-frames",
+    page_icon="🎞️",
+    layout="wide",
+    initial_sidebar_state="collapsed"
+)
+
+# Réutilisation des boîtes d'une frame quasi identique : désactivée par défaut (-1),
+# le dHash bouge à peine quand les véhicules se déplacent et le suivi perdrait leurs positions
+PHASH_THRESHOLD = get_setting("SEQUENCE_PHASH_THRESHOLD", -1, int)
+PHASH_MAX_REUSE = get_setting("SEQUENCE_PHASH_MAX_REUSE", 2, int)
+TRACKER_IOU = get_setting("TRACKER_IOU", 0.3, float)
+TRACKER_MAX_AGE = get_setting("TRACKER_MAX_AGE", 10, int)
+TRACKER_MIN_HITS = get_setting("TRACKER_MIN_HITS", 2, int)
+
+MODELES = {
+    "Modèle TRUSF": "predict_custom_yolo",
+    "YOLOv8": "predict_yolo_image",
+}
+
+CLASSES = [("🚗 Cars", "Car"), ("🏍️ Motos", "Motorcycle"), ("🚌 Bus", "Bus"), ("🚛 Trucks", "Truck")]
+
+# --- TRAITEMENT DE LA SÉQUENCE ---
+def analyse_sequence(files, endpoint, fps, progress):
+    tracker = VehicleTracker(iou_threshold=TRACKER_IOU, max_age=TRACKER_MAX_AGE, min_hits=TRACKER_MIN_HITS)
+    reference = None  # (phash, frame) de la dernière frame analysée
+    streak = 0  # frames réutilisées d'affilée depuis cette référence
+    frames = []
+    naive = Counter()
+    stats = {"skipped": 0, "saved_ms": 0.0, "failed": 0, "tracking_ms": 0.0}
+
+    for i, uploaded_file in enumerate(files):
+        bytes_data, phash, size = encode_upload(uploaded_file)
+
+        # Frame quasi identique à la dernière frame analysée : on reprend ses boîtes sans appel API,
+        # jamais plus de PHASH_MAX_REUSE fois d'affilée
+        if (PHASH_THRESHOLD >= 0 and reference is not None and streak < PHASH_MAX_REUSE
+                and bin(reference[0] ^ phash).count("1") <= PHASH_THRESHOLD):
+            source = reference[1]
+            streak += 1
+            reused = True
+            sx, sy = size[0] / source["size"][0], size[1] / source["size"][1]
+            detections = [
+                {**d, 'bbox': [d['bbox'][0] * sx, d['bbox'][1] * sy, d['bbox'][2] * sx, d['bbox'][3] * sy]}
+                for d in source["raw"]
+            ]
+            elapsed_ms = 0.0
+            stats["skipped"] += 1
+            stats["saved_ms"] += source["elapsed_ms"]
+        else:
+            start = time.perf_counter()
+            data = send_image_to_api(bytes_data, endpoint)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if data is None:
+                stats["failed"] += 1
+            detections = (data or {}).get('detections') or []
+            streak = 0
+            reused = False
+        del bytes_data
+
+        start = time.perf_counter()
+        tracked = tracker.update(detections, i / fps)
+        stats["tracking_ms"] += (time.perf_counter() - start) * 1000
+
+        naive.update(canonical_label(d['label']) for d in detections)
+        frames.append({"name": uploaded_file.name, "size": size, "raw": detections,
+                       "tracked": tracked, "elapsed_ms": elapsed_ms})
+        if not reused:
+            # Seules les frames analysées servent de référence (un échec n'a pas de boîtes fiables)
+            reference = (phash, frames[-1]) if data is not None else None
+        progress.progress((i + 1) / len(files), text=f"Frame {i + 1}/{len(files)}")
+
+    for frame in frames:
+        del frame["raw"]
+    return {"frames": frames, "tracks": tracker.tracks(), "unique": tracker.unique_counts(),
+            "naive": dict(naive), "stats": stats, "fps": fps, "file_ids": [f.file_id for f in files]}
+
+# --- VISUALISATION D'UNE FRAME (fragment : le curseur ne relance pas la page) ---
+@st.fragment
+def frame_viewer(files, sequence):
+    frames = sequence["frames"]
+    index = st.slider("Frame", 1, len(frames), 1) - 1 if len(frames) > 1 else 0
+    frame = frames[index]
+    # Par file_id : deux frames peuvent porter le même nom
+    file_id = sequence["file_ids"][index]
+    uploaded_file = next((f for f in files if f.file_id == file_id), None)
+    if uploaded_file is None:
+        st.info("Frame indisponible (fichier retiré).")
+        return
+    # Octets bruts de l'upload : le ré-encodage JPEG garde les dimensions, inutile de le refaire à chaque frame
+    bytes_data = uploaded_file.getvalue()
+    shown = [d for d in frame["tracked"] if d['confirmed']]
+    st.image(draw_detections(bytes_data, shown) if shown else bytes_data,
+             caption=f"{frame['name']} · t = {index / sequence['fps']:.2f} s", width="stretch")
+
+# ==========================================
+# EN-TÊTE
+# ==========================================
+st.title("🎞️ Suivi multi-frames")
+st.markdown("### *Comptage unique des véhicules sur une séquence*")
+
+files = st.file_uploader("Chargez les frames de la séquence (triées par nom)", type=['jpg', 'jpeg', 'png'],
+                         accept_multiple_files=True)
+
+c1, c2 = st.columns(2)
+modele = c1.selectbox("Architecture", list(MODELES))
+fps = c2.number_input("Cadence de la séquence (images/s)", min_value=0.1, value=10.0, step=1.0)
+
+files = sorted(files or [], key=lambda f: f.name)
+
+if files and st.button("LANCER LE SUIVI 🚀"):
+    progress = st.progress(0.0, text="Analyse de la séquence...")
+    st.session_state["sequence"] = analyse_sequence(files, MODELES[modele], fps, progress)
+    progress.empty()
+
+# Résultat d'un autre jeu de frames : on l'oublie plutôt que de l'afficher
+sequence = st.session_state.get("sequence")
+if sequence and sequence["file_ids"] != [f.file_id for f in files]:
+    st.session_state["sequence"] = sequence = None
+
+if sequence:
+    stats = sequence["stats"]
+    n_frames = len(sequence["frames"])
+
+    st.markdown("---")
+    st.markdown("#### 📊 Véhicules uniques")
+    cols = st.columns(len(CLASSES))
+    for col, (title, label) in zip(cols, CLASSES):
+        col.metric(title, sequence["unique"].get(label, 0),
+                   help=f"Comptage naïf (somme des frames) : {sequence['naive'].get(label, 0)}")
+
+    tracking_ms = stats["tracking_ms"] / max(n_frames, 1)
+    st.success(f"⚡ Suivi : **{tracking_ms:.2f} ms/frame** (~{1000 / max(tracking_ms, 1e-3):.0f} FPS)")
+    st.caption(f"{n_frames} frames · {stats['skipped']} quasi-doublons réutilisés "
+               f"(~{stats['saved_ms'] / 1000:.1f} s économisées) · {stats['failed']} en échec")
+
+    left, right = st.columns([3, 2], gap="medium")
+    with left:
+        frame_viewer(files, sequence)
+    with right:
+        st.markdown("#### ⏱️ Temps de présence")
+        if sequence["tracks"]:
+            df = pd.DataFrame(sequence["tracks"]).sort_values("track_id")
+            st.dataframe(
+                df[['track_id', 'label', 'first_seen', 'last_seen', 'dwell', 'hits']].style.format(
+                    {"first_seen": "{:.2f} s", "last_seen": "{:.2f} s", "dwell": "{:.2f} s"}
+                ),
+                width="stretch", hide_index=True
+            )
+        else:
+            st.warning("Aucune piste confirmée")
+
+st.markdown("---")
+st.markdown("<div style='text-align: center;'>Equipe Clairvoyance © 2025</div>", unsafe_allow_html=True)
@@ -0,0 +1,68 @@
+import threading
+
+import numpy as np
+from PIL import Image
+
+
+# --- HASH PERCEPTUEL (dHash 64 bits) ---
+def dhash(image, hash_size=8):
+    """dHash d'une image PIL : gradient horizontal sur une vignette en niveaux de gris."""
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    # reducing_gap : réduction entière rapide avant le rééchantillonnage final
+    thumb = image.resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR, reducing_gap=2.0)
+    pixels = np.asarray(thumb.convert("L"), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(values):
+        return np.bitwise_count(values)
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(values):
+        return _POPCOUNT_TABLE[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+# --- INDEX DE RECHERCHE PAR DISTANCE DE HAMMING ---
+class PerceptualIndex:
+    """Index borné (FIFO) de hashs perceptuels, recherche vectorisée par distance de Hamming."""
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._hashes = np.zeros(capacity, dtype=np.uint64)
+        self._keys = [None] * capacity
+        self._slots = {}  # clé -> position, pour ne pas indexer deux fois la même image
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def add(self, phash, key):
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None:
+                self._hashes[slot] = np.uint64(phash)
+                return
+            slot = self._next
+            if self._keys[slot] is not None:
+                del self._slots[self._keys[slot]]
+            self._hashes[slot] = np.uint64(phash)
+            self._keys[slot] = key
+            self._slots[key] = slot
+            self._next = (slot + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def search(self, phash, max_distance):
+        """Renvoie [(distance, clé)] des entrées à `max_distance` bits ou moins, les plus proches d'abord."""
+        with self._lock:
+            if not self._size:
+                return []
+            distances = _popcount(self._hashes[:self._size] ^ np.uint64(phash))
+            candidates = np.flatnonzero(distances <= max_distance)
+            order = candidates[np.argsort(distances[candidates], kind="stable")]
+            return [(int(distances[i]), self._keys[i]) for i in order]
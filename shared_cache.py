@@ -0,0 +1,113 @@
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at);
+"""
+
+
+# --- CLÉ D'UN RÉSULTAT (backend + image + endpoint) ---
+def result_key(api_url, model_version, image_key, endpoint):
+    """Clé `{backend}:{sha1}[:tiled]:{endpoint}` ; changer d'API ou de modèle change la clé."""
+    backend = hashlib.sha1(f"{api_url}|{model_version or ''}".encode()).hexdigest()[:12]
+    return f"{backend}:{image_key}:{endpoint}"
+
+
+# --- CACHE PARTAGÉ ENTRE WORKERS (SQLite, clé = hash de l'image) ---
+class SharedResultCache:
+    """Cache de résultats commun à tous les processus de l'app, borné à `budget_bytes` (LRU).
+
+    Les valeurs sont picklées : le fichier ne doit être partagé qu'entre
+    workers de la même installation. Au-delà de `ttl_seconds` après son
+    écriture, une entrée est considérée absente (le fichier survit aux
+    redémarrages et aux redéploiements du backend).
+    """
+
+    def __init__(self, db_path, budget_bytes, ttl_seconds=None):
+        self.db_path = db_path
+        self.budget_bytes = budget_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # Une connexion par thread : Streamlit sert chaque session sur son propre thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            now = time.time()
+            if self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                with conn:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            with conn:
+                conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, len(blob), now, now),
+                )
+                self._evict(conn)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.budget_bytes:
+            return
+        excess = total - self.budget_bytes
+        freed = 0
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed_at"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM results WHERE key = ?", stale)
+
+    def stats(self):
+        try:
+            count, total = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        except sqlite3.Error:
+            count, total = 0, 0
+        return {"entries": count, "bytes": total, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,82 @@
+import io
+
+import pytest
+from PIL import Image
+
+from tiling import make_tiles, merge_seams, predict_tiled
+
+
+def _frame(width, height):
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _fake_send(windows, objects, missed=()):
+    """API simulée : renvoie, pour chaque tuile, la partie visible des objets (coordonnées locales).
+
+    `missed` : couples (index de tuile, index d'objet) que le modèle « rate ».
+    """
+    calls = iter(enumerate(windows))
+
+    def send(tile_bytes, endpoint):
+        t, (x0, y0, x1, y1) = next(calls)
+        detections = []
+        for o, (label, (bx1, by1, bx2, by2)) in enumerate(objects):
+            if (t, o) in missed:
+                continue
+            cx1, cy1, cx2, cy2 = max(bx1, x0), max(by1, y0), min(bx2, x1), min(by2, y1)
+            if cx2 - cx1 > 10 and cy2 - cy1 > 10:
+                detections.append({"label": label, "confidence": 0.9,
+                                   "bbox": [cx1 - x0, cy1 - y0, cx2 - x0, cy2 - y0]})
+        return {"detections": detections, "summary": {"Car": len(detections)}, "performance": {"inference": 5}}
+    return send
+
+
+def test_make_tiles_rejects_overlap_not_smaller_than_tile():
+    with pytest.raises(ValueError):
+        make_tiles(3840, 2160, tile_size=640, overlap=640)
+
+
+def test_vehicle_across_seams_is_counted_once():
+    windows = make_tiles(1280, 640, 640, 128)
+    car = ("Car", [400, 200, 900, 400])
+    send = _fake_send(windows, [car])
+
+    result = predict_tiled(_frame(1280, 640), "predict_custom_yolo", send, tile_size=640, overlap=128, max_workers=1)
+
+    assert result["summary"]["Car"] == 1
+    assert result["detections"][0]["bbox"] == [400, 200, 900, 400]
+    assert "_clip" not in result["detections"][0]
+
+
+def test_neighbouring_vehicles_are_not_merged():
+    windows = make_tiles(1280, 640, 640, 128)
+    cars = [("Car", [100, 100, 300, 200]), ("Car", [100, 400, 300, 500]), ("Car", [900, 100, 1100, 200])]
+    send = _fake_send(windows, cars)
+
+    result = predict_tiled(_frame(1280, 640), "predict_custom_yolo", send, tile_size=640, overlap=128, max_workers=1)
+
+    assert result["summary"]["Car"] == 3
+
+
+def test_vehicle_wider_than_a_tile_with_missed_edge_fragment():
+    windows = make_tiles(1920, 640, 640, 128)
+    bus = ("Bus", [300, 100, 1800, 500])
+    send = _fake_send(windows, [bus], missed={(0, 0)})
+
+    result = predict_tiled(_frame(1920, 640), "predict_custom_yolo", send, tile_size=640, overlap=128, max_workers=1)
+
+    assert result["summary"]["Bus"] == 1
+    assert result["detections"][0]["bbox"] == [512, 100, 1800, 500]
+
+
+def test_isolated_double_clipped_box_is_kept():
+    dets = [
+        {"label": "Bus", "confidence": 0.9, "bbox": [512, 100, 1152, 500], "_clip": (True, False, True, False)},
+        {"label": "Bus", "confidence": 0.8, "bbox": [1500, 100, 1700, 300], "_clip": (False, False, False, False)},
+    ]
+
+    merged = merge_seams(dets)
+
+    assert [d["bbox"] for d in merged] == [[512, 100, 1152, 500], [1500, 100, 1700, 300]]
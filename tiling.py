@@ -0,0 +1,222 @@
+import io
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+
+# --- DÉCOUPAGE EN TUILES ---
+def _tile_starts(length, tile_size, stride):
+    if length <= tile_size:
+        return [0]
+    starts = list(range(0, length - tile_size, stride))
+    # Dernière tuile collée au bord pour couvrir toute l'image
+    starts.append(length - tile_size)
+    return starts
+
+
+def make_tiles(width, height, tile_size=640, overlap=128):
+    """Renvoie les fenêtres (x0, y0, x1, y1) couvrant l'image avec recouvrement."""
+    if tile_size <= 0 or not 0 <= overlap < tile_size:
+        raise ValueError(f"Recouvrement invalide : 0 <= overlap ({overlap}) < tile_size ({tile_size}) attendu")
+    stride = tile_size - overlap
+    return [
+        (x0, y0, min(x0 + tile_size, width), min(y0 + tile_size, height))
+        for y0 in _tile_starts(height, tile_size, stride)
+        for x0 in _tile_starts(width, tile_size, stride)
+    ]
+
+
+# --- FUSION DES BOÎTES (vectorisée, par classe) ---
+def iou_matrix(boxes_a, boxes_b):
+    """IoU de toutes les paires de boîtes [x1, y1, x2, y2] (tableaux Nx4 / Mx4)."""
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def _clusters(boxes, scores, iou_threshold):
+    """Regroupement glouton : chaque boîte conservée absorbe ses doublons."""
+    order = np.argsort(-scores)
+    ious = iou_matrix(boxes, boxes)
+    remaining = np.ones(len(boxes), dtype=bool)
+    clusters = []
+    for i in order:
+        if not remaining[i]:
+            continue
+        members = np.flatnonzero(remaining & (ious[i] >= iou_threshold))
+        members = np.union1d(members, [i])
+        remaining[members] = False
+        clusters.append((i, members))
+    return clusters
+
+
+# --- RECOLLAGE DES BOÎTES COUPÉES PAR UNE JONCTION DE TUILES ---
+# `_clip` = (gauche, haut, droite, bas) : côtés de la boîte collés à un bord
+# de tuile intérieur à l'image, donc probablement tronqués.
+def _union(a, b):
+    """Réunit deux morceaux d'un même objet ; les côtés tronqués suivent le morceau le plus extérieur."""
+    ba, bb = a['bbox'], b['bbox']
+    ca, cb = a['_clip'], b['_clip']
+    bbox = [min(ba[0], bb[0]), min(ba[1], bb[1]), max(ba[2], bb[2]), max(ba[3], bb[3])]
+    clip = (
+        ca[0] if ba[0] <= bb[0] else cb[0],
+        ca[1] if ba[1] <= bb[1] else cb[1],
+        ca[2] if ba[2] >= bb[2] else cb[2],
+        ca[3] if ba[3] >= bb[3] else cb[3],
+    )
+    best = a if a['confidence'] >= b['confidence'] else b
+    return {**best, 'bbox': bbox, '_clip': clip}
+
+
+def merge_seams(dets, ratio_threshold=0.5, containment_threshold=0.8):
+    """Recolle les morceaux d'un objet à cheval sur une jonction (une seule classe).
+
+    1. Deux boîtes tronquées sur des côtés en vis-à-vis, qui se touchent et se
+       recouvrent sur l'axe de la jonction, sont réunies.
+    2. Une boîte tronquée contenue (intersection / sa propre aire) dans une
+       boîte plus grande est supprimée.
+    """
+    dets = list(dets)
+    while len(dets) > 1:
+        boxes = np.array([d['bbox'] for d in dets], dtype=float)
+        clips = np.array([d['_clip'] for d in dets], dtype=bool)
+        a, b = boxes[:, None, :], boxes[None, :, :]
+        inter_w = np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+        inter_h = np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+        w = boxes[:, 2] - boxes[:, 0]
+        h = boxes[:, 3] - boxes[:, 1]
+        ratio_h = inter_h / np.maximum(np.minimum(h[:, None], h[None, :]), 1e-9)
+        ratio_w = inter_w / np.maximum(np.minimum(w[:, None], w[None, :]), 1e-9)
+        seam_x = clips[:, None, 2] & clips[None, :, 0] & (inter_w >= 0) & (ratio_h >= ratio_threshold)
+        seam_y = clips[:, None, 3] & clips[None, :, 1] & (inter_h >= 0) & (ratio_w >= ratio_threshold)
+        # Une boîte tronquée des deux côtés (plus large qu'une tuile) ne se recolle pas à elle-même
+        pairs = np.argwhere((seam_x | seam_y) & ~np.eye(len(dets), dtype=bool))
+        if not len(pairs):
+            break
+        i, j = pairs[0]
+        dets[i] = _union(dets[i], dets[j])
+        del dets[j]
+
+    if len(dets) > 1:
+        boxes = np.array([d['bbox'] for d in dets], dtype=float)
+        clipped = np.array([any(d['_clip']) for d in dets])
+        a, b = boxes[:, None, :], boxes[None, :, :]
+        inter = (np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+                 * np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None))
+        area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        contained = (inter / np.maximum(area, 1e-9)[:, None] >= containment_threshold) & (area[None, :] > area[:, None])
+        drop = clipped & contained.any(axis=1)
+        dets = [d for d, dropped in zip(dets, drop) if not dropped]
+    return dets
+
+
+def merge_detections(detections, iou_threshold=0.5, method="nms"):
+    """Supprime les doublons entre tuiles, classe par classe (recollage des jonctions puis NMS ou WBF)."""
+    merged = []
+    by_label = {}
+    for det in detections:
+        by_label.setdefault(det['label'], []).append(det)
+
+    for label, dets in by_label.items():
+        if any('_clip' in d for d in dets):
+            dets = merge_seams([{'_clip': (False,) * 4, **d} for d in dets])
+        boxes = np.array([d['bbox'] for d in dets], dtype=float)
+        scores = np.array([d['confidence'] for d in dets], dtype=float)
+        for keep, members in _clusters(boxes, scores, iou_threshold):
+            det = dict(dets[keep])
+            if method == "wbf" and len(members) > 1:
+                weights = scores[members]
+                fused = (boxes[members] * weights[:, None]).sum(axis=0) / weights.sum()
+                det['bbox'] = [round(float(v), 1) for v in fused]
+                det['confidence'] = float(weights.max())
+            det.pop('_clip', None)
+            merged.append(det)
+
+    merged.sort(key=lambda d: d['confidence'], reverse=True)
+    return merged
+
+
+# --- INFÉRENCE TUILÉE ---
+def _encode_tile(image, window):
+    buf = io.BytesIO()
+    image.crop(window).save(buf, format='JPEG', quality=90)
+    tile_bytes = buf.getvalue()
+    buf.close()
+    return tile_bytes
+
+
+def _clipped_sides(bbox, window, width, height, margin):
+    """Côtés de la boîte collés à un bord de tuile qui n'est pas un bord de l'image."""
+    x0, y0, x1, y1 = window
+    return (
+        x0 > 0 and bbox[0] - x0 <= margin,
+        y0 > 0 and bbox[1] - y0 <= margin,
+        x1 < width and x1 - bbox[2] <= margin,
+        y1 < height and y1 - bbox[3] <= margin,
+    )
+
+
+def predict_tiled(bytes_data, endpoint, send, tile_size=640, overlap=128,
+                  max_workers=8, iou_threshold=0.5, method="nms", edge_margin=4):
+    """Envoie l'image en tuiles parallèles et renvoie une réponse au format de l'API.
+
+    `send(tile_bytes, endpoint)` doit renvoyer le JSON de l'API ou None.
+    Renvoie None si aucune tuile n'a abouti.
+    """
+    start = time.perf_counter()
+    with Image.open(io.BytesIO(bytes_data)) as image:
+        width, height = image.size
+        windows = make_tiles(width, height, tile_size, overlap)
+        tiles = [_encode_tile(image, w) for w in windows]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tiles)))) as pool:
+        responses = list(pool.map(lambda t: send(t, endpoint), tiles))
+    del tiles
+
+    detections = []
+    summary_keys = set()
+    tile_inference = []
+    for window, data in zip(windows, responses):
+        if not data:
+            continue
+        x0, y0 = window[:2]
+        summary_keys.update((data.get('summary') or {}).keys())
+        tile_inference.append((data.get('performance') or {}).get('inference') or 0)
+        for det in data.get('detections') or []:
+            x1, y1, x2, y2 = det['bbox']
+            shifted = dict(det)
+            shifted['bbox'] = [x1 + x0, y1 + y0, x2 + x0, y2 + y0]
+            shifted['_clip'] = _clipped_sides(shifted['bbox'], window, width, height, edge_margin)
+            detections.append(shifted)
+
+    if not tile_inference:
+        return None
+
+    merged = merge_detections(detections, iou_threshold, method)
+
+    # Compteurs recalculés à partir des boîtes fusionnées
+    counts = Counter(d['label'] for d in merged)
+    summary = {key: 0 for key in summary_keys}
+    summary.update(counts)
+
+    return {
+        'detections': merged,
+        'summary': summary,
+        'performance': {
+            # Les tuiles partent en parallèle : le chemin critique est la tuile la plus lente
+            'inference': max(tile_inference),
+            'inference_total': sum(tile_inference),
+            'wall': (time.perf_counter() - start) * 1000,
+            'tiles': len(windows),
+            'tiles_failed': len(windows) - len(tile_inference),
+        },
+    }
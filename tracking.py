@@ -0,0 +1,159 @@
+from collections import Counter
+
+import numpy as np
+
+from tiling import iou_matrix
+
+
+def canonical_label(label):
+    """'car' (YOLOv8) et 'Car' (TRUSF) désignent la même classe."""
+    return str(label).capitalize()
+
+
+# --- SUIVI MULTI-FRAMES (association IoU / centroïde + filtre alpha-bêta) ---
+class VehicleTracker:
+    """Relie les détections d'une séquence de frames et attribue des identifiants stables.
+
+    Chaque piste suit un modèle à vitesse constante (filtre alpha-bêta sur les
+    4 coordonnées de la boîte). L'association est gloutonne sur un score
+    vectorisé : IoU entre boîtes prédites et détections, avec repli sur la
+    distance entre centres pour les objets rapides ou petits.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_distance=0.75, max_age=10, min_hits=2,
+                 alpha=0.8, beta=0.3, class_penalty=0.5):
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance  # en diagonales de la boîte prédite
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.alpha = alpha
+        self.beta = beta
+        self.class_penalty = class_penalty
+        self.frames = 0
+        self._next_id = 1
+        self._boxes = np.zeros((0, 4))
+        self._velocity = np.zeros((0, 4))
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._hits = np.zeros(0, dtype=np.int64)
+        self._misses = np.zeros(0, dtype=np.int64)
+        self._first_seen = np.zeros(0)
+        self._last_seen = np.zeros(0)
+        self._votes = []  # Counter des classes observées, par piste
+        self._finished = []
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _scores(self, predicted, labels, det_boxes, det_labels):
+        iou = iou_matrix(predicted, det_boxes)
+
+        centers_t = (predicted[:, :2] + predicted[:, 2:]) / 2
+        centers_d = (det_boxes[:, :2] + det_boxes[:, 2:]) / 2
+        diag = np.hypot(predicted[:, 2] - predicted[:, 0], predicted[:, 3] - predicted[:, 1])
+        dist = np.linalg.norm(centers_t[:, None, :] - centers_d[None, :, :], axis=-1)
+        dist = dist / np.maximum(diag, 1.0)[:, None]
+
+        # Repli centroïde : toujours moins prioritaire qu'un recouvrement suffisant
+        fallback = np.where(dist <= self.max_distance, (1 - dist / self.max_distance) * self.iou_threshold, 0.0)
+        scores = np.where(iou >= self.iou_threshold, iou, np.minimum(fallback, self.iou_threshold * 0.99))
+        same_class = np.asarray(labels, dtype=object)[:, None] == np.asarray(det_labels, dtype=object)[None, :]
+        return np.where(same_class, scores, scores * self.class_penalty)
+
+    @staticmethod
+    def _greedy_match(scores):
+        rows, cols = np.nonzero(scores > 0)
+        order = np.argsort(-scores[rows, cols], kind="stable")
+        used_rows, used_cols, matches = set(), set(), []
+        for r, c in zip(rows[order], cols[order]):
+            if r in used_rows or c in used_cols:
+                continue
+            used_rows.add(r)
+            used_cols.add(c)
+            matches.append((r, c))
+        return matches
+
+    def update(self, detections, timestamp):
+        """Intègre une frame ; renvoie ses détections enrichies de `track_id` / `confirmed`."""
+        self.frames += 1
+        det_boxes = np.array([d['bbox'] for d in detections], dtype=float).reshape(-1, 4)
+        det_labels = [canonical_label(d['label']) for d in detections]
+
+        # 1. Prédiction (vitesse constante)
+        predicted = self._boxes + self._velocity
+        labels = [votes.most_common(1)[0][0] for votes in self._votes]
+
+        # 2. Association
+        matches = []
+        if len(predicted) and len(det_boxes):
+            matches = self._greedy_match(self._scores(predicted, labels, det_boxes, det_labels))
+
+        # 3. Correction des pistes associées, dérive des autres
+        self._boxes = predicted
+        self._misses += 1
+        if matches:
+            rows = np.array([r for r, _ in matches])
+            cols = np.array([c for _, c in matches])
+            residual = det_boxes[cols] - predicted[rows]
+            self._boxes[rows] = predicted[rows] + self.alpha * residual
+            self._velocity[rows] += self.beta * residual
+            self._hits[rows] += 1
+            self._misses[rows] = 0
+            self._last_seen[rows] = timestamp
+            for r, c in matches:
+                self._votes[r][det_labels[c]] += 1
+
+        # 4. Nouvelles pistes pour les détections orphelines
+        track_of = {c: r for r, c in matches}
+        orphans = [c for c in range(len(det_boxes)) if c not in track_of]
+        if orphans:
+            n = len(orphans)
+            start = len(self._ids)
+            self._boxes = np.vstack([self._boxes, det_boxes[orphans]])
+            self._velocity = np.vstack([self._velocity, np.zeros((n, 4))])
+            self._ids = np.concatenate([self._ids, np.arange(self._next_id, self._next_id + n)])
+            self._hits = np.concatenate([self._hits, np.ones(n, dtype=np.int64)])
+            self._misses = np.concatenate([self._misses, np.zeros(n, dtype=np.int64)])
+            self._first_seen = np.concatenate([self._first_seen, np.full(n, float(timestamp))])
+            self._last_seen = np.concatenate([self._last_seen, np.full(n, float(timestamp))])
+            self._votes.extend(Counter({det_labels[c]: 1}) for c in orphans)
+            self._next_id += n
+            track_of.update({c: start + i for i, c in enumerate(orphans)})
+
+        tracked = []
+        for c, det in enumerate(detections):
+            r = track_of[c]
+            tracked.append({**det, 'track_id': int(self._ids[r]), 'confirmed': bool(self._hits[r] >= self.min_hits)})
+
+        # 5. Fin des pistes perdues depuis plus de max_age frames
+        expired = self._misses > self.max_age
+        if expired.any():
+            self._finished.extend(self._summaries(np.flatnonzero(expired)))
+            keep = ~expired
+            self._boxes, self._velocity = self._boxes[keep], self._velocity[keep]
+            self._ids, self._hits, self._misses = self._ids[keep], self._hits[keep], self._misses[keep]
+            self._first_seen, self._last_seen = self._first_seen[keep], self._last_seen[keep]
+            self._votes = [v for v, k in zip(self._votes, keep) if k]
+
+        return tracked
+
+    def _summaries(self, rows):
+        return [
+            {
+                'track_id': int(self._ids[r]),
+                'label': self._votes[r].most_common(1)[0][0],
+                'first_seen': float(self._first_seen[r]),
+                'last_seen': float(self._last_seen[r]),
+                'dwell': float(self._last_seen[r] - self._first_seen[r]),
+                'hits': int(self._hits[r]),
+            }
+            for r in rows
+            if self._hits[r] >= self.min_hits
+        ]
+
+    def tracks(self):
+        """Toutes les pistes confirmées (terminées et actives)."""
+        return self._finished + self._summaries(range(len(self._ids)))
+
+    def unique_counts(self):
+        """Nombre de véhicules distincts par classe sur toute la séquence."""
+        return dict(Counter(t['label'] for t in self.tracks()))